@@ -1,8 +1,8 @@
 from pathlib import Path
 from typing import Optional, Tuple
-import csv
 
 import pandas as pd  # type: ignore
+import matplotlib  # type: ignore
 import matplotlib.pyplot as plt  # type: ignore
 import numpy as np  # type: ignore
 
@@ -29,18 +29,22 @@ DEFAULT_OUTPUT_NAME: Optional[str] = "test_split_species_distribution.csv"
 # Use "{column}" as a placeholder for the column/key name.
 DEFAULT_BAR_TITLE_TEMPLATE = FOLDER_NAME
 DEFAULT_PIE_TITLE_TEMPLATE = FOLDER_NAME
+# Charts show at most this many values; the rest are summed into one
+# OTHERS bar/slice so plotting cost stays bounded for high-cardinality keys.
+DEFAULT_MAX_CATEGORIES = 30
+OTHERS_LABEL = "OTHERS"
 
 def compute_column_distribution(
     csv_path: Path,
     column: str,
     out_dir: Path,
     output_name: Optional[str] = None,
-) -> Path:
+) -> Tuple[Path, np.ndarray, np.ndarray]:
     """
     Compute a frequency distribution for `column` in `csv_path`.
 
     The function:
-      1) Reads the CSV into a pandas DataFrame.
+      1) Reads only the target column of the CSV, as a categorical.
       2) Counts occurrences of each distinct value in the target column.
       3) Computes the percentage of the total for each value.
       4) Writes a summary CSV with columns:
@@ -55,12 +59,21 @@ def compute_column_distribution(
                      is used, where `stem` is `csv_path.stem`.
 
     Returns:
-        Path to the written summary CSV.
+        (summary_csv_path, values, counts), where `values` and `counts` are
+        the summary rows as arrays, most common first.
     """
-    # Read the CSV into a DataFrame
-    df = pd.read_csv(csv_path)
-    if column not in df.columns:
+    # Validate against the header only, then read just the target column;
+    # the rest of the CSV is never needed. With a single column, parsing in
+    # one pass (low_memory=False) avoids building per-chunk categoricals that
+    # pandas then has to union.
+    if column not in pd.read_csv(csv_path, nrows=0).columns:
         raise ValueError(f"Column '{column}' not found in {csv_path}")
+    df = pd.read_csv(
+        csv_path,
+        usecols=[column],
+        dtype={column: "category"},
+        low_memory=False,
+    )
 
     # Ensure output directory exists and determine output path
     out_dir.mkdir(parents=True, exist_ok=True)
@@ -68,21 +81,102 @@ def compute_column_distribution(
         output_name = f"{csv_path.stem}_{column}_distribution.csv"
     out_path = out_dir / output_name
 
-    # get value counts for this column
-    counts = df[column].value_counts(dropna=False) 
-    
+    # get value counts for this column. The column is categorical, so count
+    # its integer codes (NaN included) rather than hashing every string.
+    # factorize numbers values in order of first appearance, and the stable
+    # sort keeps that order for ties (categorical value_counts would order
+    # ties alphabetically instead).
+    codes, uniques = pd.factorize(df[column], use_na_sentinel=False)
+    cnts = np.bincount(codes, minlength=len(uniques)).astype(np.int64)
+    order = np.argsort(-cnts, kind="stable")
+    counts = pd.Series(cnts[order], index=np.asarray(uniques, dtype=object)[order])
+
     # total count of all values (including NaN if present)
     total = int(counts.sum())
 
-    # write out the summary CSV
-    with out_path.open("w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow([column, "count", "percent"])
-        for value, count in counts.items():
-            pct = (count / total * 100.0) if total > 0 else 0.0
-            writer.writerow([value, int(count), f"{pct:.3f}"])
+    # build the summary table in one go and let pandas write it out;
+    # float_format does the only rounding of the percent column
+    percent = (counts.values / total * 100.0) if total > 0 else np.zeros(len(counts))
+    out = pd.DataFrame(
+        {
+            column: counts.index,
+            "count": counts.values,
+            "percent": percent,
+        }
+    )
+    out.to_csv(out_path, index=False, float_format="%.3f", encoding="utf-8")
+
+    return out_path, counts.index.to_numpy(dtype=object), counts.to_numpy()
+
+def _cap_categories(
+    x: np.ndarray,
+    y: np.ndarray,
+    max_categories: int = DEFAULT_MAX_CATEGORIES,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Keep the first `max_categories` values and sum the rest into OTHERS.
+
+    Expects `x`/`y` ordered most common first, as written by the summary CSV.
+    If OTHERS is already among the kept values, the tail is added to it.
+    """
+    if len(y) <= max_categories:
+        return x, y
+
+    head_x, head_y = x[:max_categories], y[:max_categories].copy()
+    tail = y[max_categories:].sum()
+    is_others = head_x == OTHERS_LABEL
+    if is_others.any():
+        head_y[is_others] += tail
+        return head_x, head_y
+    return (
+        np.concatenate([head_x, np.array([OTHERS_LABEL], dtype=object)]),
+        np.concatenate([head_y, [tail]]),
+    )
+
+def plot_distribution_arrays(
+    names: np.ndarray,
+    counts: np.ndarray,
+    out_png: Path,
+    title: str,
+    xlabel: str,
+) -> Path:
+    """
+    Plot a simple bar chart of `counts` per value in `names`.
 
-    return out_path
+    Args:
+        names:   Value labels (as str), most common first.
+        counts:  Counts (as int), aligned with `names`.
+        out_png: Output path for the PNG.
+        title:   Chart title.
+        xlabel:  Label for the x axis (usually the value column name).
+
+    Returns:
+        Path to the saved PNG file.
+    """
+    # Basic bar plot: distinct values vs counts.
+    x, y = _cap_categories(names, counts)
+
+    fig, ax = plt.subplots(figsize=(12, 4))
+    bars = ax.bar(x, y)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel("count")
+    ax.set_title(title)
+
+    # Add count labels on top of each bar for readability.
+    ax.bar_label(
+        bars,
+        labels=[str(int(count)) for count in y],
+        fontsize=8,
+        rotation=90,
+        padding=1,
+    )
+
+    plt.setp(ax.get_xticklabels(), rotation=60, ha="right", fontsize=8)
+    fig.tight_layout()
+    fig.savefig(out_png, dpi=150, pil_kwargs={"compress_level": 1})
+    plt.close(fig)
+
+    return out_png
 
 def plot_distribution(
     summary_csv: Path,
@@ -102,52 +196,98 @@ def plot_distribution(
     Returns:
         Path to the saved PNG file.
     """
-    df = pd.read_csv(summary_csv)
-    cols = list(df.columns)
+    # Validate against the header only, then load just the two columns we plot.
+    cols = list(pd.read_csv(summary_csv, nrows=0).columns)
     if len(cols) < 2:
         raise ValueError(f"{summary_csv} must have at least two columns.")
 
     if value_column is None:
         value_column = cols[0]
-    if value_column not in df.columns:
+    if value_column not in cols:
         raise ValueError(f"Column '{value_column}' not found in {summary_csv}")
-    if "count" not in df.columns:
+    if "count" not in cols:
         raise ValueError(f"'count' column not found in {summary_csv}")
 
     if out_png is None:
         out_png = summary_csv.with_suffix(".png")
 
-    # Basic bar plot: distinct values vs counts.
-    x = df[value_column].astype(str)
-    y = df["count"].astype(int)
+    # Parse the two plotted columns straight into their final dtypes so
+    # no cast pass is needed; na_filter=False keeps every label a str.
+    tbl = pd.read_csv(
+        summary_csv,
+        usecols=[value_column, "count"],
+        dtype={value_column: str, "count": np.int64},
+        na_filter=False,
+    )
 
-    plt.figure(figsize=(12, 4))
-    ax = plt.gca()
-    bars = ax.bar(x, y)
-    ax.set_xlabel(value_column)
-    ax.set_ylabel("count")
-    # Title can be customized via DEFAULT_BAR_TITLE_TEMPLATE.
-    ax.set_title(DEFAULT_BAR_TITLE_TEMPLATE.format(column=value_column))
+    return plot_distribution_arrays(
+        names=tbl[value_column].to_numpy(copy=False),
+        counts=tbl["count"].to_numpy(copy=False),
+        out_png=out_png,
+        title=DEFAULT_BAR_TITLE_TEMPLATE.format(column=value_column),
+        xlabel=value_column,
+    )
 
-    # Add count labels on top of each bar for readability.
-    for bar, count in zip(bars, y):
-        height = bar.get_height()
-        ax.text(
-            bar.get_x() + bar.get_width() / 2.0,
-            height,
-            str(int(count)),
-            ha="center",
-            va="bottom",
-            fontsize=8,
-            rotation=90,
-        )
-
-    plt.xticks(rotation=60, ha="right", fontsize=8)
-    plt.tight_layout()
-    plt.savefig(out_png, dpi=200)
-    plt.close()
+def _render_pie(
+    x: np.ndarray,
+    y: np.ndarray,
+    value_column: str,
+    pie_path: Path,
+) -> Path:
+    """
+    Draw the distribution as a pie chart with the legend beside it.
 
-    return out_png
+    Args:
+        x: Value labels (as str), one per slice.
+        y: Counts (as int), aligned with `x`.
+        value_column: Name of the value column; used for the title and legend.
+        pie_path: Output path for the PNG.
+
+    Returns:
+        Path to the saved PNG file.
+    """
+    x, y = _cap_categories(x, y)
+
+    # Create a pie chart with a separate legend so labels do not overlap
+    # on the figure.
+    total = int(y.sum()) if len(y) > 0 else 0
+
+    fig, ax = plt.subplots(figsize=(6, 6))
+
+    # Simple pie with no labels/percentages drawn directly on slices.
+    wedges = ax.pie(
+        y,
+        labels=None,
+        startangle=90,
+    )[0]
+
+    # Build legend labels with percentages.
+    if total > 0:
+        legend_labels = [f"{name} ({cnt / total * 100:.1f}%)" for name, cnt in zip(x, y)]
+    else:
+        legend_labels = [name for name in x]
+
+    # Title can be customized via DEFAULT_PIE_TITLE_TEMPLATE.
+    ax.set_title(DEFAULT_PIE_TITLE_TEMPLATE.format(column=value_column))
+    ax.legend(
+        wedges,
+        legend_labels,
+        title=value_column,
+        loc="center left",
+        bbox_to_anchor=(1.0, 0.5),
+        fontsize=7,
+    )
+
+    fig.tight_layout()
+    fig.savefig(
+        pie_path,
+        dpi=150,
+        bbox_inches="tight",
+        pil_kwargs={"compress_level": 1},
+    )
+    plt.close(fig)
+
+    return pie_path
 
 def compute_and_plot_distribution(
     csv_path: Path,
@@ -174,70 +314,47 @@ def compute_and_plot_distribution(
     Returns:
         (summary_csv_path, bar_png_path, pie_png_path)
     """
-    summary_csv = compute_column_distribution(
+    summary_csv, values, counts = compute_column_distribution(
         csv_path=csv_path,
         column=column,
         out_dir=out_dir,
         output_name=output_name,
     )
+    # Plot straight from the computed arrays; the summary CSV is only
+    # written for the user and never read back. Missing values are labelled
+    # "" as in the summary CSV, so this matches re-plotting it with
+    # plot_distribution.
+    labels = values.astype(str).astype(object)
+    labels[pd.isna(values)] = ""
 
     if plot_name is None:
-        bar_path = None
+        bar_path = summary_csv.with_suffix(".png")
     else:
         bar_path = out_dir / plot_name
 
-    bar_png = plot_distribution(
-        summary_csv=summary_csv,
-        value_column=column,
+    bar_png = plot_distribution_arrays(
+        names=labels,
+        counts=counts,
         out_png=bar_path,
+        title=DEFAULT_BAR_TITLE_TEMPLATE.format(column=column),
+        xlabel=column,
     )
+
     # Pie chart filename
     if pie_name is None:
         pie_path = summary_csv.with_suffix(".pie.png")
     else:
         pie_path = out_dir / pie_name
 
-    # Load distribution once and create a pie chart with a separate legend
-    # so labels do not overlap on the figure.
-    df = pd.read_csv(summary_csv)
-    x = df[column].astype(str)
-    y = df["count"].astype(int)
-    total = int(y.sum()) if len(y) > 0 else 0
-
-    fig, ax = plt.subplots(figsize=(6, 6))
-
-    # Simple pie with no labels/percentages drawn directly on slices.
-    wedges = ax.pie(
-        y,
-        labels=None,
-        startangle=90,
-    )[0]
-
-    # Build legend labels with percentages.
-    if total > 0:
-        legend_labels = [f"{name} ({cnt / total * 100:.1f}%)" for name, cnt in zip(x, y)]
-    else:
-        legend_labels = [name for name in x]
-
-    # Title can be customized via DEFAULT_PIE_TITLE_TEMPLATE.
-    ax.set_title(DEFAULT_PIE_TITLE_TEMPLATE.format(column=column))
-    ax.legend(
-        wedges,
-        legend_labels,
-        title=column,
-        loc="center left",
-        bbox_to_anchor=(1.0, 0.5),
-        fontsize=7,
-    )
-
-    plt.tight_layout()
-    plt.savefig(pie_path, dpi=200, bbox_inches="tight")
-    plt.close()
+    _render_pie(labels, counts, column, pie_path)
 
     return summary_csv, bar_png, pie_path
 
 
 if __name__ == "__main__":
+    # Headless backend for script runs: plots are only written to files.
+    # Set here rather than at import so importers keep their own backend.
+    matplotlib.use("Agg")
     # Simple script mode: uses the DEFAULT_* constants defined above
     # to compute and plot the distribution in one step.
     compute_and_plot_distribution(
@@ -1,11 +1,13 @@
 from pathlib import Path
 from typing import Optional, Tuple, Dict, Any
-import csv
 import json
 from collections import Counter
+from operator import itemgetter
 
 import pandas as pd  # type: ignore
+import matplotlib  # type: ignore
 import matplotlib.pyplot as plt  # type: ignore
+import numpy as np  # type: ignore
 
 """
 GENERIC JSON DATASET DISTRIBUTION
@@ -29,18 +31,23 @@ DEFAULT_OUTPUT_NAME: Optional[str] = "metadata_species_distribution.csv"
 # Use "{column}" as a placeholder for the key/column name.
 DEFAULT_BAR_TITLE_TEMPLATE = "Distribution of the dataset after combining rare species into OTHERS"
 DEFAULT_PIE_TITLE_TEMPLATE = "Distribution of the dataset after combining rare species into OTHERS"
+# Charts show at most this many values; the rest are summed into one
+# OTHERS bar/slice so plotting cost stays bounded for high-cardinality keys.
+DEFAULT_MAX_CATEGORIES = 30
+OTHERS_LABEL = "OTHERS"
 
 def compute_key_distribution(
     json_path: Path,
     key: str,
     out_dir: Path,
     output_name: Optional[str] = None,
-) -> Path:
+) -> Tuple[Path, np.ndarray, np.ndarray]:
     """
     Compute a frequency distribution for `key` in a JSON list-of-dicts file.
 
     The function:
-      1) Loads the JSON file as a list of records (dicts).
+      1) Loads the JSON file as a list of records (dicts); raises ValueError
+         if any record is not a dict.
       2) Extracts `record[key]` for each record (missing keys count as None).
       3) Counts occurrences of each distinct value.
       4) Computes the percentage of the total for each value.
@@ -56,25 +63,35 @@ def compute_key_distribution(
                      is used, where `stem` is `json_path.stem`.
 
     Returns:
-        Path to the written summary CSV.
+        (summary_csv_path, values, counts), where `values` and `counts` are
+        the summary rows as arrays, most common first.
     """
-    # Load JSON records
-    with json_path.open("r", encoding="utf-8") as f:
-        data = json.load(f)
+    # Load JSON records; json.loads decodes the UTF-8 bytes itself, so skip
+    # the text-mode file wrapper.
+    data = json.loads(json_path.read_bytes())
 
     if not isinstance(data, list):
         raise ValueError(f"Expected a list of records in {json_path}, got {type(data)}")
 
-    # Extract values; use None for missing keys explicitly
-    values = []
-    for rec in data:
-        if isinstance(rec, dict):
-            values.append(rec.get(key))
-        else:
-            # If a record is not a dict, treat as missing
-            values.append(None)
-
-    counts = Counter(values)
+    # Count values straight from the records. Fast path: every record is a
+    # dict holding `key`, so a C-level itemgetter does the extraction. If some
+    # record is missing it, recount with None for the missing keys. Neither
+    # path checks record types up front.
+    try:
+        try:
+            counts = Counter(map(itemgetter(key), data))
+        except KeyError:
+            counts = Counter(rec.get(key) for rec in data)
+    except (TypeError, AttributeError) as e:
+        # Either some record is not a dict, or a value cannot be counted
+        # (e.g. an unhashable list). Only the former is a schema error; the
+        # records are type-checked here, on the failure path only.
+        for rec in data:
+            if not isinstance(rec, dict):
+                raise ValueError(
+                    f"Expected dict records in {json_path}, got {type(rec)}"
+                ) from e
+        raise
     total = sum(counts.values())
 
     out_dir.mkdir(parents=True, exist_ok=True)
@@ -82,14 +99,98 @@ def compute_key_distribution(
         output_name = f"{json_path.stem}_{key}_distribution.csv"
     out_path = out_dir / output_name
 
-    with out_path.open("w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow([key, "count", "percent"])
-        for value, count in counts.most_common():
-            pct = (count / total * 100.0) if total > 0 else 0.0
-            writer.writerow([value, int(count), f"{pct:.3f}"])
+    # Unpack the Counter into parallel arrays and order them most common
+    # first; the stable sort keeps first-seen order for ties, same as
+    # Counter.most_common().
+    names = np.fromiter(counts.keys(), dtype=object, count=len(counts))
+    cnts = np.fromiter(counts.values(), dtype=np.int64, count=len(counts))
+    order = np.argsort(-cnts, kind="stable")
+    names, cnts = names[order], cnts[order]
+
+    # float_format does the only rounding of the percent column
+    percent = (cnts / total * 100.0) if total > 0 else np.zeros(len(cnts))
+    out = pd.DataFrame(
+        {
+            key: names,
+            "count": cnts,
+            "percent": percent,
+        }
+    )
+    out.to_csv(out_path, index=False, float_format="%.3f", encoding="utf-8")
+
+    return out_path, names, cnts
+
+
+def _cap_categories(
+    x: np.ndarray,
+    y: np.ndarray,
+    max_categories: int = DEFAULT_MAX_CATEGORIES,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Keep the first `max_categories` values and sum the rest into OTHERS.
+
+    Expects `x`/`y` ordered most common first, as written by the summary CSV.
+    If OTHERS is already among the kept values, the tail is added to it.
+    """
+    if len(y) <= max_categories:
+        return x, y
+
+    head_x, head_y = x[:max_categories], y[:max_categories].copy()
+    tail = y[max_categories:].sum()
+    is_others = head_x == OTHERS_LABEL
+    if is_others.any():
+        head_y[is_others] += tail
+        return head_x, head_y
+    return (
+        np.concatenate([head_x, np.array([OTHERS_LABEL], dtype=object)]),
+        np.concatenate([head_y, [tail]]),
+    )
+
+
+def plot_distribution_arrays(
+    names: np.ndarray,
+    counts: np.ndarray,
+    out_png: Path,
+    title: str,
+    xlabel: str,
+) -> Path:
+    """
+    Plot a simple bar chart of `counts` per value in `names`.
+
+    Args:
+        names:   Value labels (as str), most common first.
+        counts:  Counts (as int), aligned with `names`.
+        out_png: Output path for the PNG.
+        title:   Chart title.
+        xlabel:  Label for the x axis (usually the value column name).
+
+    Returns:
+        Path to the saved PNG file.
+    """
+    # Basic bar plot: distinct values vs counts.
+    x, y = _cap_categories(names, counts)
 
-    return out_path
+    fig, ax = plt.subplots(figsize=(12, 4))
+    bars = ax.bar(x, y)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel("count")
+    ax.set_title(title)
+
+    # Add count labels on top of each bar for readability.
+    ax.bar_label(
+        bars,
+        labels=[str(int(count)) for count in y],
+        fontsize=8,
+        rotation=90,
+        padding=1,
+    )
+
+    plt.setp(ax.get_xticklabels(), rotation=60, ha="right", fontsize=8)
+    fig.tight_layout()
+    fig.savefig(out_png, dpi=150, pil_kwargs={"compress_level": 1})
+    plt.close(fig)
+
+    return out_png
 
 
 def plot_distribution(
@@ -110,51 +211,96 @@ def plot_distribution(
     Returns:
         Path to the saved PNG file.
     """
-    df = pd.read_csv(summary_csv)
-    cols = list(df.columns)
+    # Validate against the header only, then load just the two columns we plot.
+    cols = list(pd.read_csv(summary_csv, nrows=0).columns)
     if len(cols) < 2:
         raise ValueError(f"{summary_csv} must have at least two columns.")
 
     if value_column is None:
         value_column = cols[0]
-    if value_column not in df.columns:
+    if value_column not in cols:
         raise ValueError(f"Column '{value_column}' not found in {summary_csv}")
-    if "count" not in df.columns:
+    if "count" not in cols:
         raise ValueError(f"'count' column not found in {summary_csv}")
 
     if out_png is None:
         out_png = summary_csv.with_suffix(".png")
 
-    x = df[value_column].astype(str)
-    y = df["count"].astype(int)
+    # Parse the two plotted columns straight into their final dtypes so
+    # no cast pass is needed; na_filter=False keeps every label a str.
+    tbl = pd.read_csv(
+        summary_csv,
+        usecols=[value_column, "count"],
+        dtype={value_column: str, "count": np.int64},
+        na_filter=False,
+    )
 
-    plt.figure(figsize=(12, 4))
-    ax = plt.gca()
-    bars = ax.bar(x, y)
-    ax.set_xlabel(value_column)
-    ax.set_ylabel("count")
-    # Title can be customized via DEFAULT_BAR_TITLE_TEMPLATE.
-    ax.set_title(DEFAULT_BAR_TITLE_TEMPLATE.format(column=value_column))
+    return plot_distribution_arrays(
+        names=tbl[value_column].to_numpy(copy=False),
+        counts=tbl["count"].to_numpy(copy=False),
+        out_png=out_png,
+        title=DEFAULT_BAR_TITLE_TEMPLATE.format(column=value_column),
+        xlabel=value_column,
+    )
 
-    # Add count labels on top of each bar for readability.
-    for bar, count in zip(bars, y):
-        height = bar.get_height()
-        ax.text(
-            bar.get_x() + bar.get_width() / 2.0,
-            height,
-            str(int(count)),
-            ha="center",
-            va="bottom",
-            fontsize=8,
-            rotation=90,
-        )
-
-    plt.xticks(rotation=60, ha="right", fontsize=8)
-    plt.tight_layout()
-    plt.savefig(out_png, dpi=200)
-    plt.close()
 
-    return out_png
+def _render_pie(
+    x: np.ndarray,
+    y: np.ndarray,
+    value_column: str,
+    pie_path: Path,
+) -> Path:
+    """
+    Draw the distribution as a pie chart with the legend beside it.
+
+    Args:
+        x: Value labels (as str), one per slice.
+        y: Counts (as int), aligned with `x`.
+        value_column: Name of the value column; used for the title and legend.
+        pie_path: Output path for the PNG.
+
+    Returns:
+        Path to the saved PNG file.
+    """
+    x, y = _cap_categories(x, y)
+
+    # Create a pie chart with a separate legend
+    total = int(y.sum()) if len(y) > 0 else 0
+
+    fig, ax = plt.subplots(figsize=(6, 6))
+
+    wedges = ax.pie(
+        y,
+        labels=None,
+        startangle=90,
+    )[0]
+
+    if total > 0:
+        legend_labels = [f"{name} ({cnt / total * 100:.1f}%)" for name, cnt in zip(x, y)]
+    else:
+        legend_labels = [name for name in x]
+
+    # Title can be customized via DEFAULT_PIE_TITLE_TEMPLATE.
+    ax.set_title(DEFAULT_PIE_TITLE_TEMPLATE.format(column=value_column))
+    ax.legend(
+        wedges,
+        legend_labels,
+        title=value_column,
+        loc="center left",
+        bbox_to_anchor=(1.0, 0.5),
+        fontsize=7,
+    )
+
+    fig.tight_layout()
+    fig.savefig(
+        pie_path,
+        dpi=150,
+        bbox_inches="tight",
+        pil_kwargs={"compress_level": 1},
+    )
+    plt.close(fig)
+
+    return pie_path
 
 
 def compute_and_plot_distribution(
@@ -182,22 +328,30 @@ def compute_and_plot_distribution(
     Returns:
         (summary_csv_path, bar_png_path, pie_png_path)
     """
-    summary_csv = compute_key_distribution(
+    summary_csv, values, counts = compute_key_distribution(
         json_path=json_path,
         key=key,
         out_dir=out_dir,
         output_name=output_name,
     )
+    # Plot straight from the computed arrays; the summary CSV is only
+    # written for the user and never read back. Missing values are labelled
+    # "" as in the summary CSV, so this matches re-plotting it with
+    # plot_distribution.
+    labels = values.astype(str).astype(object)
+    labels[pd.isna(values)] = ""
 
     if plot_name is None:
-        bar_path = None
+        bar_path = summary_csv.with_suffix(".png")
     else:
         bar_path = out_dir / plot_name
 
-    bar_png = plot_distribution(
-        summary_csv=summary_csv,
-        value_column=key,
+    bar_png = plot_distribution_arrays(
+        names=labels,
+        counts=counts,
         out_png=bar_path,
+        title=DEFAULT_BAR_TITLE_TEMPLATE.format(column=key),
+        xlabel=key,
     )
 
     # Pie chart filename
@@ -206,44 +360,15 @@ def compute_and_plot_distribution(
     else:
         pie_path = out_dir / pie_name
 
-    # Load distribution once and create a pie chart with a separate legend
-    df = pd.read_csv(summary_csv)
-    x = df[key].astype(str)
-    y = df["count"].astype(int)
-    total = int(y.sum()) if len(y) > 0 else 0
-
-    fig, ax = plt.subplots(figsize=(6, 6))
-
-    wedges = ax.pie(
-        y,
-        labels=None,
-        startangle=90,
-    )[0]
-
-    if total > 0:
-        legend_labels = [f"{name} ({cnt / total * 100:.1f}%)" for name, cnt in zip(x, y)]
-    else:
-        legend_labels = [name for name in x]
-
-    # Title can be customized via DEFAULT_PIE_TITLE_TEMPLATE.
-    ax.set_title(DEFAULT_PIE_TITLE_TEMPLATE.format(column=key))
-    ax.legend(
-        wedges,
-        legend_labels,
-        title=key,
-        loc="center left",
-        bbox_to_anchor=(1.0, 0.5),
-        fontsize=7,
-    )
-
-    plt.tight_layout()
-    plt.savefig(pie_path, dpi=200, bbox_inches="tight")
-    plt.close()
+    _render_pie(labels, counts, key, pie_path)
 
     return summary_csv, bar_png, pie_path
 
 
 if __name__ == "__main__":
+    # Headless backend for script runs: plots are only written to files.
+    # Set here rather than at import so importers keep their own backend.
+    matplotlib.use("Agg")
     # Simple script mode: uses DEFAULT_* constants defined above.
     compute_and_plot_distribution(
         json_path=DEFAULT_JSON,